@@ -6,16 +6,33 @@
 # Run: streamlit run korea_market_dashboard_dashed_rates_labels_excel.py
 
 import io
-import math
+import os
+import hashlib
+import functools
 import datetime as dt
-from dateutil.relativedelta import relativedelta
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import yfinance as yf
+import matplotlib
+matplotlib.use('Agg')  # headless raster backend; never pick an interactive one on the server
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MultipleLocator, FuncFormatter
-from matplotlib.dates import DateFormatter
+from matplotlib.dates import DateFormatter, date2num
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:
+    import orjson  # optional: faster JSON decode straight from bytes
+except ImportError:
+    orjson = None
+try:
+    from tsdownsample import LTTBDownsampler  # optional: shape-preserving chart downsampling
+except ImportError:
+    LTTBDownsampler = None
 
 st.set_page_config(page_title="Korea Market Dashboard (Dashed + Labels + Excel)", layout="wide")
 
@@ -31,6 +48,8 @@ with st.sidebar:
                                min_value=dt.date(1990,1,1), max_value=dt.date.today())
     normalize_left = st.checkbox("Normalize KOSPI / USDKRW to 100 at start", value=True)
     show_table = st.checkbox("Show data table (last 30 days)", value=False)
+    hi_dpi_export = st.checkbox("High-DPI PNG export (150 dpi)", value=False,
+                                help="On-page chart renders at 100 dpi; tick to download a sharper 150 dpi PNG.")
     st.divider()
     st.subheader("🔑 ECOS (BOK) API")
     st.markdown("한국은행 **ECOS Open API 인증키**를 입력하세요. (https://ecos.bok.or.kr/api/)")
@@ -44,38 +63,152 @@ with st.sidebar:
 # ----------------------
 # Data fetchers
 # ----------------------
-@st.cache_data(show_spinner=True)
+def _json(r: requests.Response):
+    """Decode a JSON response body, with orjson when it is installed."""
+    return orjson.loads(r.content) if orjson is not None else r.json()
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """
+    One pooled keep-alive session for all fetchers and fetch threads. Cached as a
+    resource so it survives script reruns instead of being rebuilt on each one.
+    """
+    s = requests.Session()
+    s.headers.update({"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip"})
+    s.mount("https://", HTTPAdapter(
+        pool_connections=8, pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+    ))
+    return s
+
+# On-disk parquet cache of fetched Series, so restarts and new workers start warm
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "kor_market")
+CACHE_MAX_AGE = dt.timedelta(days=7)  # older files are pruned on write
+
+def _cache_path(key: str) -> str:
+    # Hashed so API keys in the arguments never end up in file names
+    return os.path.join(CACHE_DIR, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".parquet")
+
+def _read_cached(path: str):
+    try:
+        return pd.read_parquet(path).iloc[:, 0]
+    except Exception:
+        return None
+
+def _write_cached(path: str, s: pd.Series) -> None:
+    try:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        s.to_frame().to_parquet(tmp, compression="zstd")
+        os.replace(tmp, path)
+    except Exception:
+        pass
+    _prune_cache()
+
+def _prune_cache() -> None:
+    """Delete cache files not rewritten within CACHE_MAX_AGE (old start dates, old keys)."""
+    cutoff = time.time() - CACHE_MAX_AGE.total_seconds()
+    try:
+        entries = list(os.scandir(CACHE_DIR))
+    except OSError:
+        return
+    for e in entries:
+        try:
+            if e.is_file() and e.stat().st_mtime < cutoff:
+                os.remove(e.path)
+        except OSError:
+            pass
+
+def disk_cache(ttl: dt.timedelta):
+    """
+    Cache a Series-returning fetcher on disk, keyed by function name + arguments.
+    A file younger than `ttl` is served without calling the fetcher. If the fetch comes
+    back empty (network/API failure), the stored copy is served whatever its age.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args):
+            path = _cache_path(f"{fn.__name__}:{args!r}")
+            try:
+                fresh = time.time() - os.path.getmtime(path) < ttl.total_seconds()
+            except OSError:
+                fresh = False
+            if fresh:
+                cached = _read_cached(path)
+                if cached is not None:
+                    return cached
+            s = fn(*args)
+            if not s.empty:
+                _write_cached(path, s)
+                return s
+            stale = _read_cached(path)
+            return stale if stale is not None else s
+        return wrapper
+    return decorator
+
+# Raw fetchers use st.cache_resource: hits hand back the cached Series itself (no pickle
+# round-trip), so callers must treat returned Series as read-only.
+@st.cache_resource(show_spinner=False, ttl=300, max_entries=8)  # prices move intraday
+@disk_cache(ttl=dt.timedelta(minutes=5))
 def fetch_yf(symbol: str, start: dt.date) -> pd.Series:
     """Download from Yahoo Finance and return a named Series."""
-    df = yf.download(symbol, start=start, progress=False, auto_adjust=True)
+    try:
+        # threads=False: callers already run fetches on their own pool
+        df = yf.download(symbol, start=start, progress=False, auto_adjust=True, threads=False)
+    except Exception:
+        return pd.Series(dtype=float, name=symbol)
     if df.empty:
         return pd.Series(dtype=float, name=symbol)
     col = 'Adj Close' if 'Adj Close' in df.columns else 'Close'
-    s = df[col].copy()
+    s = df[col]
+    if isinstance(s, pd.DataFrame):  # newer yfinance keeps a (field, ticker) column level
+        s = s.iloc[:, 0]
     s.name = symbol
     return s
 
-@st.cache_data(show_spinner=True)
+@st.cache_resource
+def _fred_csv_validators() -> dict:
+    """series_id -> (ETag, Last-Modified, Series) from the last full CSV download."""
+    return {}
+
+@st.cache_resource(show_spinner=False, ttl=3600, max_entries=8)
+@disk_cache(ttl=dt.timedelta(hours=1))
 def fetch_fred_csv(series_id: str) -> pd.Series:
     """
     Fetch a FRED series via fredgraph CSV export (no API key).
+    Sends a conditional GET when a previous download is known; a 304 reuses it.
     Returns a Series named `series_id` indexed by datetime.
     """
-    import io
     url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
+    known = _fred_csv_validators().get(series_id)
+    headers = {}
+    if known is not None:
+        etag, last_modified, _ = known
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
     try:
-        r = requests.get(url, timeout=30, headers={"User-Agent":"Mozilla/5.0"})
-        r.raise_for_status()
-        df_csv = pd.read_csv(io.StringIO(r.text))
-        if 'DATE' not in df_csv.columns or series_id not in df_csv.columns:
+        with get_session().get(url, timeout=30, headers=headers, stream=True) as r:
+            if r.status_code == 304 and known is not None:
+                return known[2]
+            r.raise_for_status()
+            # Stream the (gunzipped) body straight into the C reader, which also parses
+            # dates and the '.' missing-value marker; no full bytes/str copy of the CSV.
+            r.raw.decode_content = True
+            df_csv = pd.read_csv(r.raw, parse_dates=['DATE'], na_values=['.', ''],
+                                 dtype={series_id: 'float64'})
+        if series_id not in df_csv.columns:
             return pd.Series(dtype=float, name=series_id)
-        df_csv['DATE'] = pd.to_datetime(df_csv['DATE'])
-        s = pd.Series(pd.to_numeric(df_csv[series_id], errors='coerce').values, index=df_csv['DATE'], name=series_id)
+        s = pd.Series(df_csv[series_id].to_numpy(), index=pd.DatetimeIndex(df_csv['DATE']), name=series_id)
+        if r.headers.get("ETag") or r.headers.get("Last-Modified"):
+            _fred_csv_validators()[series_id] = (r.headers.get("ETag"), r.headers.get("Last-Modified"), s)
         return s
     except Exception:
         return pd.Series(dtype=float, name=series_id)
 
-@st.cache_data(show_spinner=True)
+@st.cache_resource(show_spinner=False, ttl=3600, max_entries=8)
+@disk_cache(ttl=dt.timedelta(hours=1))
 def fetch_fred_api_json(series_id: str, api_key: str, start: dt.date) -> pd.Series:
     """
     Fetch FRED observations via official API (requires API key).
@@ -89,27 +222,28 @@ def fetch_fred_api_json(series_id: str, api_key: str, start: dt.date) -> pd.Seri
         f"?series_id={series_id}&api_key={api_key}&file_type=json&observation_start={start_s}"
     )
     try:
-        r = requests.get(url, timeout=30, headers={"User-Agent":"Mozilla/5.0"})
+        r = get_session().get(url, timeout=30)
         r.raise_for_status()
-        js = r.json()
+        js = _json(r)
         obs = js.get("observations", [])
         if not obs:
             return pd.Series(dtype=float, name=series_id)
-        dates = pd.to_datetime([o.get("date") for o in obs])
-        vals = pd.to_numeric([o.get("value", ".") for o in obs], errors="coerce")
-        s = pd.Series(vals, index=dates, name=series_id).dropna()
-        return s
+        raw = pd.DataFrame(obs, columns=["date", "value"])
+        idx = pd.to_datetime(raw["date"], format="%Y-%m-%d", cache=True)  # FRED dates are always ISO
+        vals = pd.to_numeric(raw["value"], errors="coerce")
+        return pd.Series(vals.to_numpy(), index=idx, name=series_id).dropna()
     except Exception:
         return pd.Series(dtype=float, name=series_id)
 
 def yyyymm(d: dt.date) -> str:
     return f"{d.year}{d.month:02d}"
 
-@st.cache_data(show_spinner=True)
+@st.cache_resource(show_spinner=False, ttl=3600, max_entries=8)
+@disk_cache(ttl=dt.timedelta(hours=1))
 def fetch_bok_base_rate(api_key: str, start: dt.date) -> pd.Series:
     """
     ECOS StatisticSearch:
-      https://ecos.bok.or.kr/api/StatisticSearch/{API_KEY}/json/kr/1/100000/722Y001/M/{YYYYMM}/{YYYYMM}/0101000
+      https://ecos.bok.or.kr/api/StatisticSearch/{API_KEY}/json/kr/1/{N_MONTHS}/722Y001/M/{YYYYMM}/{YYYYMM}/0101000
     722Y001: 기준금리 및 여수신금리, 0101000: 한국은행 기준금리, 주기: M(월)
     Returns monthly series.
     """
@@ -117,157 +251,131 @@ def fetch_bok_base_rate(api_key: str, start: dt.date) -> pd.Series:
     if not api_key:
         return pd.Series(dtype=float, name=name)
 
+    today = dt.date.today()
     start_m = yyyymm(start)
-    end_m = yyyymm(dt.date.today())
+    end_m = yyyymm(today)
+    # Ask only for as many rows as there are months in range (+ slack), not 100000
+    n_months = (today.year - start.year) * 12 + (today.month - start.month) + 2
     url = (
-        f"https://ecos.bok.or.kr/api/StatisticSearch/{api_key}/json/kr/1/100000/"
+        f"https://ecos.bok.or.kr/api/StatisticSearch/{api_key}/json/kr/1/{n_months}/"
         f"722Y001/M/{start_m}/{end_m}/0101000"
     )
     try:
-        r = requests.get(url, timeout=30)
+        r = get_session().get(url, timeout=30)
         r.raise_for_status()
-        data = r.json()
+        data = _json(r)
         container = data.get("StatisticSearch") or data.get("statisticSearch") or data.get("Statisticsearch")
         rows = (container or {}).get("row", [])
-        times, vals = [], []
-        for item in rows:
-            t = item.get("TIME") or item.get("time") or item.get("TIME_PERIOD")
-            v = item.get("DATA_VALUE") or item.get("data_value") or item.get("OBS_VALUE")
-            if not t or v in (None, "", "."):
-                continue
-            try:
-                y = int(str(t)[:4]); m = int(str(t)[4:6])
-                # Use month end date
-                dt_idx = dt.date(y, m, 1) + relativedelta(months=1) - relativedelta(days=1)
-                times.append(dt_idx)
-                vals.append(float(v))
-            except Exception:
-                continue
-        if not times:
+        # Normalize key case once for the whole frame, then resolve the field aliases
+        raw = pd.DataFrame(rows).rename(columns=str.upper)
+        time_col = next((c for c in ('TIME', 'TIME_PERIOD') if c in raw.columns), None)
+        val_col = next((c for c in ('DATA_VALUE', 'OBS_VALUE') if c in raw.columns), None)
+        if time_col is None or val_col is None:
             return pd.Series(dtype=float, name=name)
-        s = pd.Series(vals, index=pd.to_datetime(times), name=name).sort_index()
-        return s
+        # YYYYMM -> month end date, vectorized
+        idx = pd.to_datetime(raw[time_col].astype(str).str[:6], format='%Y%m', errors='coerce') + pd.offsets.MonthEnd(0)
+        vals = pd.to_numeric(raw[val_col], errors='coerce')
+        s = pd.Series(vals.to_numpy(), index=idx, name=name)
+        return s[s.index.notna()].dropna().sort_index()
     except Exception:
         return pd.Series(dtype=float, name=name)
 
-@st.cache_data(show_spinner=True)
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=8)
 def load_us_fed_rate(fred_api_key: str, start_date: dt.date):
     """
-    Load Fed Funds with robust fallbacks:
+    Load Fed Funds with robust fallbacks, in priority order:
     1) FRED API EFFR (daily) if key provided
     2) FRED CSV EFFR (daily)
     3) FRED API FEDFUNDS (monthly) if key provided
     4) FRED CSV FEDFUNDS (monthly)
+    All candidates are requested concurrently, so a blocked source costs one
+    round-trip instead of stacking; the first non-empty one in order wins.
     """
-    # 1) API EFFR
+    candidates = []
     if fred_api_key:
-        s = fetch_fred_api_json("EFFR", fred_api_key, start_date)
-        if not s.empty and s.dropna().size > 0:
-            s.name = "US Fed Funds (%)"
-            return s, "EFFR via FRED API (daily)"
-    # 2) CSV EFFR
-    s = fetch_fred_csv("EFFR")
-    if not s.empty and s.dropna().size > 0:
-        s.name = "US Fed Funds (%)"
-        return s, "EFFR via CSV (daily)"
-    # 3) API FEDFUNDS
+        candidates.append((fetch_fred_api_json, ("EFFR", fred_api_key, start_date), "EFFR via FRED API (daily)"))
+    candidates.append((fetch_fred_csv, ("EFFR",), "EFFR via CSV (daily)"))
     if fred_api_key:
-        s = fetch_fred_api_json("FEDFUNDS", fred_api_key, start_date)
-        if not s.empty and s.dropna().size > 0:
-            s.name = "US Fed Funds (%)"
-            return s, "FEDFUNDS via FRED API (monthly avg)"
-    # 4) CSV FEDFUNDS
-    s = fetch_fred_csv("FEDFUNDS")
-    if not s.empty and s.dropna().size > 0:
-        s.name = "US Fed Funds (%)"
-        return s, "FEDFUNDS via CSV (monthly avg)"
+        candidates.append((fetch_fred_api_json, ("FEDFUNDS", fred_api_key, start_date), "FEDFUNDS via FRED API (monthly avg)"))
+    candidates.append((fetch_fred_csv, ("FEDFUNDS",), "FEDFUNDS via CSV (monthly avg)"))
+
+    ex = ThreadPoolExecutor(max_workers=len(candidates))
+    try:
+        futs = [(ex.submit(fn, *args), label) for fn, args, label in candidates]
+        for fut, label in futs:
+            s = fut.result()
+            if s.notna().any():
+                return s.rename("US Fed Funds (%)"), label
+    finally:
+        # Don't wait on lower-priority stragglers once a winner is found
+        ex.shutdown(wait=False, cancel_futures=True)
     return pd.Series(dtype=float, name="US Fed Funds (%)"), "unavailable"
 
 # ----------------------
-# Fetch data
+# Fetch data + build frame
 # ----------------------
-st.write("Fetching data...")
 KOSPI = "^KS11"
 USDKRW = "KRW=X"
+FRAME_TTL = 300  # seconds; no longer than the shortest fetcher TTL (fetch_yf)
 
-kospi = fetch_yf(KOSPI, start_date)
-usdk_rw = fetch_yf(USDKRW, start_date)
-effr_raw, fed_src = load_us_fed_rate(fred_api_key, start_date)
-bok_base = fetch_bok_base_rate(ecos_api_key, start_date)
-
-# Build daily frame
-idx = pd.date_range(start=start_date, end=dt.date.today(), freq='D')
-df = pd.DataFrame(index=idx)
-
-if not kospi.empty:
-    df['KOSPI'] = kospi.reindex(idx).ffill()
-if not usdk_rw.empty:
-    df['USD/KRW'] = usdk_rw.reindex(idx).ffill()
+@st.cache_data(show_spinner=False, ttl=FRAME_TTL, max_entries=8)
+def build_frame(start_date: dt.date, fred_api_key: str, ecos_api_key: str):
+    """
+    Fetch all sources and assemble the forward-filled frame.
+    Returns (df, fed_src, last_obs) where last_obs is the last raw Fed Funds date (or None).
+    """
+    # The four sources are independent network round-trips; overlap them.
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        f_kospi = ex.submit(fetch_yf, KOSPI, start_date)
+        f_usd = ex.submit(fetch_yf, USDKRW, start_date)
+        f_fed = ex.submit(load_us_fed_rate, fred_api_key, start_date)
+        f_bok = ex.submit(fetch_bok_base_rate, ecos_api_key, start_date)
+        kospi = f_kospi.result()
+        usdk_rw = f_usd.result()
+        effr_raw, fed_src = f_fed.result()
+        bok_base = f_bok.result()
+
+    # Frame on the union of the sources' own dates (trading days + rate observation dates),
+    # forward-filled; no synthetic calendar grid to reindex onto
+    series = [s.rename(name) for s, name in ((kospi, 'KOSPI'), (usdk_rw, 'USD/KRW'),
+                                              (effr_raw, 'US Fed Funds (%)'), (bok_base, 'BOK Base Rate (%)'))
+              if not s.empty]
+    if series:
+        df = pd.concat(series, axis=1, sort=True).ffill()
+        df = df.loc[pd.Timestamp(start_date):pd.Timestamp(dt.date.today())]
+    else:
+        df = pd.DataFrame(index=pd.DatetimeIndex([]))
+    if 'US Fed Funds (%)' in df.columns:
+        df['US Fed Funds (%)'] = df['US Fed Funds (%)'].bfill()
+
+    last_obs = effr_raw.dropna().index.max() if not effr_raw.empty else None
+    return df, fed_src, last_obs
+
+@st.cache_data(show_spinner=False, ttl=FRAME_TTL, max_entries=8)
+def normalized_left(df: pd.DataFrame, normalize_left: bool):
+    """Left-axis frame (KOSPI, USD/KRW), optionally rebased to 100. Returns (left_df, ylabel)."""
+    left_cols = [c for c in ['KOSPI', 'USD/KRW'] if c in df.columns]
+    left_df = df[left_cols]
+    if normalize_left and not left_df.empty:
+        # One broadcast multiply; a column whose first value is 0 is left as-is
+        first = left_df.bfill().iloc[0]
+        return left_df.mul((100.0 / first).where(first != 0, 1.0)), "Index (Start = 100)"
+    return left_df, "Level"
 
-# Rates daily series (for right dashed lines)
-rates_cols = []
-if not effr_raw.empty:
-    effr = effr_raw.reindex(idx).ffill().bfill()
-    if not effr.dropna().empty:
-        df['US Fed Funds (%)'] = effr
-        rates_cols.append('US Fed Funds (%)')
-if not bok_base.empty:
-    df['BOK Base Rate (%)'] = bok_base.reindex(idx).ffill()
-    rates_cols.append('BOK Base Rate (%)')
-
-# Normalize left-axis series if selected
-left_cols = [c for c in ['KOSPI', 'USD/KRW'] if c in df.columns]
-left_df = df[left_cols].copy()
-if normalize_left and not left_df.empty:
-    for c in left_df.columns:
-        fv = left_df[c].dropna().iloc[0]
-        if fv != 0:
-            left_df[c] = (left_df[c] / fv) * 100.0
-    left_ylabel = "Index (Start = 100)"
+st.write("Fetching data...")
+# Per-session memo: widget-only reruns skip even build_frame's cache-key hashing.
+# Entries expire with build_frame's own TTL so intraday prices still refresh.
+fetch_sig = (start_date, fred_api_key, ecos_api_key)
+memo = st.session_state.get("frame_memo")
+if memo is not None and memo[0] == fetch_sig and time.monotonic() - memo[1] < FRAME_TTL:
+    df, fed_src, last_obs = memo[2]
 else:
-    left_ylabel = "Level"
+    df, fed_src, last_obs = build_frame(start_date, fred_api_key, ecos_api_key)
+    st.session_state["frame_memo"] = (fetch_sig, time.monotonic(), (df, fed_src, last_obs))
 
-# ----------------------
-# Plot (fixed colors + dashed rates + top-left labels)
-# ----------------------
-fig, ax_left = plt.subplots(figsize=(12, 6), dpi=150)
-fig.subplots_adjust(top=0.85)  # room for top labels
-
-# Left: specified colors
-line_colors = {'KOSPI': 'black', 'USD/KRW': 'yellow'}
-if not left_df.empty:
-    cols = list(left_df.columns)
-    colors = [line_colors.get(c, None) for c in cols]
-    left_df.plot(ax=ax_left, color=colors, linewidth=1.8)
-
-# Right: dashed rate lines
-ax_right = ax_left.twinx()
-if rates_cols:
-    if 'US Fed Funds (%)' in df.columns:
-        ax_right.plot(df.index, df['US Fed Funds (%)'], linestyle='--', color='red', linewidth=2.0, label='US Fed Funds (%)')
-    if 'BOK Base Rate (%)' in df.columns:
-        ax_right.plot(df.index, df['BOK Base Rate (%)'], linestyle='--', color='blue', linewidth=2.0, label='BOK Base Rate (%)')
-    try:
-        rmin = math.floor(float(df[rates_cols].min().min()))
-        rmax = math.ceil(float(df[rates_cols].max().max()))
-        if rmin == rmax:
-            rmax = rmin + 1
-        ax_right.set_ylim(rmin-0.1, rmax+0.1)
-    except Exception:
-        pass
-    ax_right.yaxis.set_major_locator(MultipleLocator(1.0))
-    ax_right.yaxis.set_major_formatter(FuncFormatter(lambda y, _: f"{int(y)}%"))
-    ax_right.set_ylabel("Rate (%) — 1% steps (dashed)")
-
-# Axis labels, grid, and date format
-ax_left.set_xlabel("Date")
-ax_left.set_ylabel(left_ylabel)
-ax_left.grid(True, alpha=0.3)
-ax_left.set_title(f"From {start_date} to {dt.date.today()}")
-ax_left.xaxis.set_major_formatter(DateFormatter('%Y-%m-%d'))
-for label in ax_left.get_xticklabels():
-    label.set_rotation(0)
-    label.set_ha('center')
+# Rates daily series (for right dashed lines)
+rates_cols = [c for c in ['US Fed Funds (%)', 'BOK Base Rate (%)'] if c in df.columns]
+left_df, left_ylabel = normalized_left(df, normalize_left)
 
 # ----------------------
 # Top-left single-line data labels (yyyy-mm-dd)
@@ -277,60 +385,163 @@ def fmt(v, is_rate=False):
         return "NA"
     return f"{v:,.2f}%" if is_rate else f"{v:,.2f}"
 
-last_vals = []
-if 'KOSPI' in df.columns:
-    last_vals.append(f"KOSPI: {fmt(df['KOSPI'].dropna().iloc[-1] if not df['KOSPI'].dropna().empty else float('nan'))}")
-if 'USD/KRW' in df.columns:
-    last_vals.append(f"USD/KRW: {fmt(df['USD/KRW'].dropna().iloc[-1] if not df['USD/KRW'].dropna().empty else float('nan'))}")
-if 'US Fed Funds (%)' in df.columns:
-    last_vals.append(f"US Fed Funds: {fmt(df['US Fed Funds (%)'].dropna().iloc[-1] if not df['US Fed Funds (%)'].dropna().empty else float('nan'), True)}")
-if 'BOK Base Rate (%)' in df.columns:
-    last_vals.append(f"BOK Base Rate: {fmt(df['BOK Base Rate (%)'].dropna().iloc[-1] if not df['BOK Base Rate (%)'].dropna().empty else float('nan'), True)}")
+# df is already forward-filled, so its last row holds every series' latest value
+last_row = df.iloc[-1] if not df.empty else pd.Series(dtype=float)
+label_specs = [('KOSPI', 'KOSPI', False), ('USD/KRW', 'USD/KRW', False),
+               ('US Fed Funds (%)', 'US Fed Funds', True), ('BOK Base Rate (%)', 'BOK Base Rate', True)]
+last_vals = [f"{label}: {fmt(last_row.get(col, float('nan')), is_rate)}"
+             for col, label, is_rate in label_specs if col in df.columns]
 
 label_line = " | ".join(last_vals)
-# Put a white-rounded box at top-left, left-aligned on a single line
-ax_left.text(0.01, 1.05, label_line, transform=ax_left.transAxes, ha='left', va='bottom',
-             fontsize=10, bbox=dict(facecolor='white', alpha=0.8, edgecolor='none'))
 
-# Legend
-h1, l1 = ax_left.get_legend_handles_labels()
-h2, l2 = ax_right.get_legend_handles_labels()
-if h1 or h2:
-    ax_left.legend(h1 + h2, l1 + l2, loc='best')
+# ----------------------
+# Plot (fixed colors + dashed rates + top-left labels)
+# ----------------------
+LINE_COLORS = {'KOSPI': 'black', 'USD/KRW': 'yellow'}
+RATE_COLORS = {'US Fed Funds (%)': 'red', 'BOK Base Rate (%)': 'blue'}
+
+@st.cache_resource
+def _fig_axes():
+    """
+    One Figure / (left, right) Axes pair reused by every render instead of a fresh
+    plt.subplots() per call. cache_resource is process-wide, so renders hold the lock.
+    """
+    fig, ax_left = plt.subplots(figsize=(12, 6), dpi=100)
+    fig.subplots_adjust(top=0.85)  # room for top labels
+    return fig, ax_left, ax_left.twinx(), threading.Lock()
 
-# Render plot
-st.pyplot(fig, clear_figure=True)
+@st.cache_data(show_spinner=False, ttl=FRAME_TTL, max_entries=8)
+def render_chart_png(left_df: pd.DataFrame, rates_df: pd.DataFrame, left_ylabel: str,
+                     title: str, label_line: str, dpi: int = 100) -> bytes:
+    """
+    Draw the dual-axis chart and return it as PNG bytes.
+    Cached, so reruns with unchanged inputs skip the Agg rasterization entirely.
+    """
+    fig, ax_left, ax_right, lock = _fig_axes()
+    with lock:
+        ax_left.clear()
+        ax_right.clear()
+        # clear() resets the twin's right-side ticks and transparent background
+        ax_right.yaxis.tick_right()
+        ax_right.yaxis.set_label_position('right')
+        ax_right.patch.set_visible(False)
+
+        # Left: specified colors; plain float dates skip pandas' datetime plotting machinery
+        if not left_df.empty:
+            x = date2num(left_df.index.to_numpy())
+            for c in left_df.columns:
+                ax_left.plot(x, left_df[c].to_numpy(), color=LINE_COLORS.get(c), linewidth=1.8, label=c)
+            ax_left.xaxis_date()
+
+        # Right: dashed rate lines
+        if not rates_df.columns.empty:
+            for c in rates_df.columns:
+                ax_right.plot(rates_df.index, rates_df[c], linestyle='--', color=RATE_COLORS.get(c), linewidth=2.0,
+                              label=c, drawstyle='steps-post')
+            try:
+                arr = rates_df.to_numpy(dtype='float64', copy=False)
+                rmin = int(np.floor(np.nanmin(arr)))
+                rmax = int(np.ceil(np.nanmax(arr)))
+                if rmin == rmax:
+                    rmax = rmin + 1
+                ax_right.set_ylim(rmin-0.1, rmax+0.1)
+            except Exception:
+                pass
+            ax_right.yaxis.set_major_locator(MultipleLocator(1.0))
+            ax_right.yaxis.set_major_formatter(FuncFormatter(lambda y, _: f"{int(y)}%"))
+            ax_right.set_ylabel("Rate (%) — 1% steps (dashed)")
+
+        # Axis labels, grid, and date format
+        ax_left.set_xlabel("Date")
+        ax_left.set_ylabel(left_ylabel)
+        ax_left.grid(True, alpha=0.3)
+        ax_left.set_title(title)
+        ax_left.xaxis.set_major_formatter(DateFormatter('%Y-%m-%d'))
+        for label in ax_left.get_xticklabels():
+            label.set_rotation(0)
+            label.set_ha('center')
+
+        # Put a white-rounded box at top-left, left-aligned on a single line
+        ax_left.text(0.01, 1.05, label_line, transform=ax_left.transAxes, ha='left', va='bottom',
+                     fontsize=10, bbox=dict(facecolor='white', alpha=0.8, edgecolor='none'))
+
+        # Legend
+        h1, l1 = ax_left.get_legend_handles_labels()
+        h2, l2 = ax_right.get_legend_handles_labels()
+        if h1 or h2:
+            ax_left.legend(h1 + h2, l1 + l2, loc='best')
+
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    return buf.getvalue()
+
+DISPLAY_MAX_POINTS = 1500
+DISPLAY_TARGET_POINTS = 1000
+
+def for_display(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Thin long ranges for the chart only (downloads keep full data): LTTB per column when
+    tsdownsample is installed, which keeps peaks and troughs; otherwise weekly closes.
+    """
+    if len(frame) <= DISPLAY_MAX_POINTS or frame.columns.empty:
+        return frame
+    if LTTBDownsampler is None:
+        return frame.resample('W').last()
+    ds = LTTBDownsampler()
+    keep = None
+    for c in frame.columns:
+        col = frame[c].dropna()
+        if len(col) > DISPLAY_TARGET_POINTS:
+            pos = ds.downsample(col.index.to_numpy().view('int64'), col.to_numpy(dtype='float64'),
+                                n_out=DISPLAY_TARGET_POINTS)
+            col = col.iloc[pos]
+        keep = col.index if keep is None else keep.union(col.index)
+    return frame.loc[keep]
+
+def rate_steps(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rates are step functions: keep only the rows where some rate changes (plus the
+    last row, so steps run to today) and draw them with steps-post.
+    """
+    if frame.empty:
+        return frame
+    keep = frame.ne(frame.shift()).any(axis=1)
+    keep.iloc[-1] = True
+    return frame[keep]
+
+# Render plot at 100 dpi (2.25x fewer pixels than 150); the same bytes back the default download
+chart_args = (for_display(left_df), rate_steps(df[rates_cols]), left_ylabel,
+              f"From {start_date} to {dt.date.today()}", label_line)
+png_bytes = render_chart_png(*chart_args)
+st.image(png_bytes, width="stretch")
 
 # ----------------------
 # Downloads (PNG + Excel with yyyy-mm-dd dates)
 # ----------------------
-# PNG
-buf_png = io.BytesIO()
-fig.savefig(buf_png, format="png", dpi=150, bbox_inches="tight")
-buf_png.seek(0)
 today_str = dt.date.today().strftime("%Y-%m-%d")
 
 st.download_button(
     label="📥 Download chart as PNG",
-    data=buf_png.getvalue(),
+    data=render_chart_png(*chart_args, dpi=150) if hi_dpi_export else png_bytes,
     file_name=f"market_dashboard_{today_str}.png",
     mime="image/png"
 )
 
 # Excel (dates as yyyy-mm-dd)
-df_out = df.copy()
-df_out.index.name = "Date"
-df_xlsx = df_out.reset_index()
-df_xlsx["Date"] = df_xlsx["Date"].dt.strftime("%Y-%m-%d")
+@st.cache_data(show_spinner=False, ttl=FRAME_TTL, max_entries=8)
+def build_xlsx(df: pd.DataFrame) -> bytes:
+    """Workbook bytes for the download; cached so reruns don't rewrite every cell."""
+    df_xlsx = df.rename_axis("Date").reset_index()
+    df_xlsx["Date"] = df_xlsx["Date"].dt.strftime("%Y-%m-%d")
 
-buf_xlsx = io.BytesIO()
-with pd.ExcelWriter(buf_xlsx, engine="openpyxl") as writer:
-    df_xlsx.to_excel(writer, index=False, sheet_name="Data")
-buf_xlsx.seek(0)
+    buf_xlsx = io.BytesIO()
+    with pd.ExcelWriter(buf_xlsx, engine="xlsxwriter") as writer:
+        df_xlsx.to_excel(writer, index=False, sheet_name="Data")
+    return buf_xlsx.getvalue()
 
 st.download_button(
     label="📒 Download data as Excel (yyyy-mm-dd)",
-    data=buf_xlsx.getvalue(),
+    data=build_xlsx(df),
     file_name=f"market_dashboard_{today_str}.xlsx",
     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 )
@@ -339,14 +550,14 @@ st.download_button(
 # Table (last 30 days, yyyy-mm-dd index)
 # ----------------------
 if show_table:
-    df_show = df.tail(30).copy()
-    df_show.index = df_show.index.strftime("%Y-%m-%d")
-    st.dataframe(df_show, use_container_width=True)
+    # The frame holds observation dates only, so slice by calendar days rather than rows
+    df_show = df.loc[df.index[-1] - pd.Timedelta(days=30):] if not df.empty else df
+    df_show = df_show.set_axis(df_show.index.strftime("%Y-%m-%d"))
+    st.dataframe(df_show, width="stretch")
 
 # Status captions
 try:
     if 'US Fed Funds (%)' in df.columns:
-        last_obs = effr_raw.dropna().index.max()
         last_obs_str = last_obs.strftime("%Y-%m-%d") if last_obs is not None else "N/A"
         st.caption(f"U.S. Fed Funds source: **{fed_src}**, last observation: **{last_obs_str}**")
     elif fed_src == 'unavailable':